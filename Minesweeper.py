@@ -1,25 +1,18 @@
 import tkinter as tk
 import sys
-from enum import Enum
-from random import randint
+import argparse
+import logging
+from collections import deque
+from operator import or_, sub
+from random import sample
 
 
 ####### NOTES #######
 # Bottlenecks and performance inefficiencies:
-# - Mine placement is performed by picking random spots on the board
-#   until one is not already a mine, then making it a mine. This works
-#   to avoid the same spot being set to a mine more than once, but
-#   introduces inefficiencies with higher mine:board size ratios.
-#   Shouldn't result in infinite loop since checks are in place to ensure
-#   TOTAL_MINES is not bigger than the board size when set. Upon testing,
-#   even when the whole board is mines this does not seem to cause notable
-#   performance issues, but is still worth noting as an inefficiency.
-# - The biggest performance issue which causes very obvious delays is the
-#   iterative destruction of every frame inside the board upon board regeneration.
-#   This could maybe be avoided by deleting the board altogether and
-#   adjusting the code for such an action accordingly? At worst this would
-#   perform the same but at least lets tkinter handle destroying all the frames.
-#   At best, tkinter has a much more optimized way of deleting them all this way.
+# - The board used to be one frame per space, and destroying every frame upon
+#   board regeneration caused very obvious delays. The board is now a single
+#   canvas with a rectangle and a label per space, and those items are reset and
+#   reused between boards, so only spaces added by a bigger board are ever drawn.
 #
 # Bugs and general issues:
 # - Larger boards and smaller screens lead to the program extending outside the
@@ -32,9 +25,6 @@ from random import randint
 #   pretty as long as it's fun and functional. The program should allow larger boards
 #   and potentially ridiculous setups with the only limit being performance, not
 #   UI challenges.
-# - Recursion with RevealEmpty is not optimized, and maximum recursion depth can
-#   be reached with bigger empty boards. Maybe change the recursion to a breadth-
-#   first search.
 #
 # Possible additions and improvements:
 # - Button or feature to view exposed board after loss (and mines after win).
@@ -54,19 +44,29 @@ from random import randint
 
 
 # Arguments passed to program
-# Variables for controlling board size, number of mines, etc
+# Variables for controlling board size, number of mines, etc. All are optional and positional,
+# in the order: width, height, mines, debug info ("True" to enable)
 
-n = len(sys.argv)
+parser = argparse.ArgumentParser(description="Play Minesweeper.")
+parser.add_argument("width", type=int, nargs="?", default=20, help="width of the board in spaces (default: 20)")
+parser.add_argument("height", type=int, nargs="?", default=20, help="height of the board in spaces (default: 20)")
+parser.add_argument("mines", type=int, nargs="?", default=60, help="number of mines on the board (default: 60)")
+parser.add_argument("debug", nargs="?", default="False", help="\"True\" to print debug info (default: False)")
+args = parser.parse_args()
 
-BOARD_WIDTH = int(sys.argv[1]) if (n > 1) else 20
-BOARD_HEIGHT = int(sys.argv[2]) if (n > 2) else 20
-TOTAL_MINES = int(sys.argv[3]) if (n > 3) else 60
+BOARD_WIDTH = args.width
+BOARD_HEIGHT = args.height
+TOTAL_MINES = args.mines
 # Validate mines is not larger than size of board
 boardsize = BOARD_HEIGHT * BOARD_WIDTH
 if TOTAL_MINES > boardsize:
     print(f"Defined number of mines ({TOTAL_MINES}) is larger than the size of the board ({BOARD_WIDTH} * {BOARD_HEIGHT} = {boardsize}). Setting mine count to {boardsize}")
     TOTAL_MINES = boardsize
-PRINT_DEBUG_INFO = True if (n > 4 and sys.argv[4] == "True") else False
+PRINT_DEBUG_INFO = args.debug == "True"
+# Debug info is logged rather than printed, so when disabled the messages are never formatted
+logging.basicConfig(format="%(message)s")
+log = logging.getLogger("minesweeper")
+log.setLevel(logging.DEBUG if PRINT_DEBUG_INFO else logging.WARNING)
 
 print(f"Opening Minesweeper game with board size {BOARD_WIDTH} x {BOARD_HEIGHT} with {TOTAL_MINES} "
       + "mines with%s debug info." %('' if PRINT_DEBUG_INFO else 'out'))
@@ -77,299 +77,370 @@ window = tk.Tk()
 window.title("Minesweeper")
 # Board is the gameplay area, menu is the UI below. Config is parametrization inside menu
 board = tk.Frame(master=window)
+# Canvas on which every space of the board is drawn as a rectangle (and text when labeled)
+canvas = tk.Canvas(master=board, borderwidth=0, highlightthickness=0)
+canvas.pack()
 menu = tk.Frame(master=window)
 configframe = tk.Frame(master=menu)
 # Inputs for changing the parameters of the board (upper limits can be increased)
 widthpicker = tk.Spinbox(configframe, textvariable=tk.IntVar(window, BOARD_WIDTH), from_=1, to=100)
 heightpicker = tk.Spinbox(configframe, textvariable=tk.IntVar(window, BOARD_HEIGHT), from_=1, to=100)
 minepicker = tk.Spinbox(configframe, textvariable=tk.IntVar(window, TOTAL_MINES), from_=1, to=100)
-# Variable for non-mine pieces left, displayed and used to determine when player has won.
-pieces_left = (BOARD_HEIGHT * BOARD_WIDTH) - TOTAL_MINES
-pieces_left_str = tk.StringVar(window, f"Pieces left: {pieces_left}")
-# Bool for tracking if baby mode enabled
-babymode = False
+# Displayed number of non-mine pieces left, kept up to date by the current game
+pieces_left_str = tk.StringVar(window)
+# Width and height in pixels of a single space drawn on the canvas
+CELL_SIZE = 30
+# Label colors of revealed spaces, indexed by their adjacent mine count (0 has no label)
+COLOR_LUT = (None, "blue", "green", "yellow", "red", "#571100", "magenta", "black", "black")
+# Coord offsets of the 8 spaces surrounding a space
+NEIGHBORS = tuple((dx,dy) for dx in (-1,0,1) for dy in (-1,0,1) if (dx,dy) != (0,0))
 
-# Enumerator for representing a space's property
-class Piece(Enum):
-    HIDDEN = 0
-    EMPTY = 1
-    MINE = 2
+# Values representing a space's property. Plain ints so they compare cheaply and fit in a bytearray.
+HIDDEN, EMPTY, MINE = 0, 1, 2
+# Names of the above values, indexed by value, for debug info
+PIECE_NAMES = ("HIDDEN", "EMPTY", "MINE")
+# Every property of a space is packed into a single byte: bits 0-3 hold the adjacent mine count,
+# bits 4-5 the type (one of the values above) and bit 6 whether the space is flagged
+COUNT_MASK = 0x0F
+TYPE_SHIFT = 4
+TYPE_MASK = 0x30
+FLAG_BIT = 0x40
 
 
 
 # Functions
 
-# Destroys the frames of the old board and returns a 2d array of hidden space values.
-def ClearBoard():
-    # Destroy every frame already in the board
-    global board
-    while len(board.grid_slaves()) > 0:
-        if PRINT_DEBUG_INFO:
-            print(f"Destroying board slave. {len(board.grid_slaves())} remaining.")
-        board.grid_slaves()[0].destroy()
-    # Return an empty 2d array of space values (not related to the board frames)
-    return [ [{"type": Piece.HIDDEN, "count": 0, "flag": False} for j in range(BOARD_HEIGHT)] for i in range(BOARD_WIDTH)]
-
-# Changes the color of the board. DOES NOT apply to newly created widgets, like labels in spaces.
-def ChangeColor(color):
-    for i in range(BOARD_HEIGHT):
-        for j in range(BOARD_WIDTH):
-            frame = board.grid_slaves(row=i, column=j)[0]
-            if frame['bg'] != "red":
-                frame.configure(bg=color)
-                if len(frame.pack_slaves()) > 0:
-                    frame.pack_slaves()[0].configure(bg=color)
-
-# Sets baby mode (baby mode allows continuing on the same board after a loss)
-def SetBabyMode():
-    global babymode
-    babymode = True
-    ChangeColor("#8adaff")
-
-# Updates board specs to user input and generates new board. Use when values should be updated.
-def NewGame():
-    global BOARD_WIDTH
-    global BOARD_HEIGHT
-    global TOTAL_MINES
+# Flood fill over the packed board: reveals the space at the given coords and, if it has no adjacent
+# mines, every connected space with no adjacent mines plus their bordering spaces. Uses a breadth-first
+# search with a queue, so large empty areas can't exceed the recursion limit.
+# Only reads and writes the cells passed in (nothing to do with tkinter), and returns a list of
+# (x, y, count, flagged) for every space revealed, in reveal order, so the caller can draw them.
+# Note: the starting space must be within the board, hidden and not flagged.
+def FloodFill(cells, width, height, x, y):
+    queue = deque([(x,y)])
+    revealed = []
+    # Bind globals and methods used on every loop iteration to locals, which are faster to look up
+    neighbors = NEIGHBORS
+    hidden = HIDDEN << TYPE_SHIFT
+    empty = EMPTY << TYPE_SHIFT
+    type_mask = TYPE_MASK
+    count_mask = COUNT_MASK
+    flag_bit = FLAG_BIT
+    popleft = queue.popleft
+    append = queue.append
+    record = revealed.append
+    while queue:
+        x, y = popleft()
+        cell = cells[x][y]
+        # Skip piece if it was already revealed (it can be queued by more than one neighbor)
+        if cell & type_mask != hidden:
+            continue
+        # Change piece to empty, unflagged and keeping its count
+        count = cell & count_mask
+        cells[x][y] = empty | count
+        record((x, y, count, cell & flag_bit))
+        # If piece has no adjacent mine count, queue the surrounding spaces within the board that are still hidden
+        if count == 0:
+            for dx, dy in neighbors:
+                nx = x + dx
+                ny = y + dy
+                if 0 <= nx < width and 0 <= ny < height and cells[nx][ny] & type_mask == hidden:
+                    append((nx,ny))
+    return revealed
+
+# Returns the adjacent mine count of every space of a board of the given size, given columns of bytes
+# that are 1 where a mine is. Sums each 3x3 neighbourhood in two passes (across neighbouring columns,
+# then along each column) with map/zip over whole columns, so no Python code runs per space.
+# The mine itself is subtracted.
+def CountMines(mines, width, height):
+    padding = bytes(height)
+    padded = [padding] + mines + [padding]
+    counts = []
+    for x in range(width):
+        across = b"\0" + bytes(map(sum, zip(padded[x], padded[x+1], padded[x+2]))) + b"\0"
+        window = map(sum, zip(across, across[1:], across[2:]))
+        counts.append(bytearray(map(sub, window, mines[x])))
+    return counts
+
+# Updates board specs to user input and starts a new game on the board. Use when values should be updated.
+def NewGame(previous):
     new_w = int(widthpicker.get())
     new_h = int(heightpicker.get())
     new_m = int(minepicker.get())
     # Validate mines can fit in board
-    BOARD_WIDTH = new_w
-    BOARD_HEIGHT = new_h
-    if new_m <= new_w * new_h:
-        TOTAL_MINES = new_m
-    elif PRINT_DEBUG_INFO:
-        print(f"Updated number of mines ({new_m}) is larger than the updated size of the board ({new_w} * {new_h} = {new_m * new_h}). Setting mine count to {new_m * new_h}")
-        TOTAL_MINES = new_m * new_h
-    if PRINT_DEBUG_INFO:
-        print(f"Generating new board with size {BOARD_WIDTH} x {BOARD_HEIGHT} with {TOTAL_MINES}")
-    GenerateBoard()
-
-# Opens a popup window stating loss, allows Retry, Give Up, or Baby Mode
-def GameOver(x,y):
-    # Change clicked mine space to red
-    board.grid_slaves(row=y, column=x)[0].configure(bg="red")
-    # Create new window for game over prompt
-    top= tk.Toplevel(window, padx=20, pady=20)
-    top.title("Game Over")
-    tk.Label(top, text= "You Lost!", font=('Mistral 18 bold')).pack()
-    retry = tk.Button(top, text="Retry", command = lambda: [GenerateBoard(),top.destroy()])
-    retry.pack(side=tk.LEFT)
-    quit = tk.Button(top, text="Give Up", command = lambda: sys.exit())
-    quit.pack(side=tk.LEFT)
-    baby = tk.Button(top, text="Baby Mode", command = lambda: [SetBabyMode(), top.destroy()])
-    baby.pack(side=tk.LEFT)
-    # Set board regeneration on prompt window manual deletion
-    top.protocol('WM_DELETE_WINDOW', lambda: [GenerateBoard(), top.destroy()])
-    # Set game window unclickable while prompt is open
-    top.transient(window)
-    top.wait_visibility()
-    top.grab_set()
-
-# Similar to GameOver but for win prompt. Allows New Game or Quit
-def GameWin():
-    top= tk.Toplevel(window, padx=10, pady=20)
-    top.title("You Win!")
-    tk.Label(top, text= "Congratulations! You won!", font=('Mistral 18 bold')).pack()
-    retry = tk.Button(top, text="New Game", command = lambda: [GenerateBoard(),top.destroy()])
-    retry.pack()
-    quit = tk.Button(top, text="Quit", command = lambda: sys.exit())
-    quit.pack()
-    top.transient(window)
-    top.wait_visibility()
-    top.grab_set()
-
-# Reveals the space at the specified coordinate and, if empty, recursively reveals nearby spaces
-# Note: this should not be used when a mine or flagged space is clicked.
-def RevealEmpty(x,y):
-    # Verify given coord is within board bounds
-    if x >= 0 and x < BOARD_WIDTH and y >=0 and y < BOARD_HEIGHT:
-        # Reference the frame and associated piece represenation at the coords
-        wframe = board.grid_slaves(row=y, column=x)[0]
-        piece = spaces[x][y]
-        # Verify piece is not mine, and is still hidden
-        if piece["type"] == Piece.HIDDEN:
-            # Remove flag on piece being revealed (only happens to spaces recursively revealed)
-            if piece["flag"]:
-                piece["flag"] = False
-                wframe.pack_slaves()[0].destroy()
-            # Change piece to empty and update frame appearance
-            piece["type"] = Piece.EMPTY
-            wframe.configure(relief=tk.FLAT)
-            # If piece's count is 0, create a label with according number and color
-            if piece["count"] > 0:
-                wframe.configure(relief=tk.RAISED, borderwidth=1)
-                if piece["count"] == 1:
-                    color = "blue"
-                elif piece["count"] == 2:
-                    color = "green"
-                elif piece["count"] == 2:
-                    color = "yellow"
-                elif piece["count"] == 3:
-                    color = "red"
-                elif piece["count"] == 4:
-                    color = "#571100"
-                elif piece["count"] == 5:
-                    color = "magenta"
+    if new_m > new_w * new_h:
+        # Mines are sampled without replacement, so the count must never exceed the board size
+        log.debug("Updated number of mines (%d) is larger than the updated size of the board (%d * %d = %d). Setting mine count to %d",
+                  new_m, new_w, new_h, new_w * new_h, new_w * new_h)
+        new_m = new_w * new_h
+    log.debug("Generating new board with size %d x %d with %d", new_w, new_h, new_m)
+    return Game(new_w, new_h, new_m, previous)
+
+
+# A single game on a board of a fixed size and number of mines. Each new game (including retries)
+# is a new Game, so the board size never changes during one and is read from the instance.
+# Creating a game resets the board canvas, places mines, and binds the board and menu to the game.
+# The previous game, if given, passes on its canvas items so they can be reused.
+class Game:
+    def __init__(self, width, height, mines, previous=None):
+        self.width = width
+        self.height = height
+        self.mines = mines
+        # Number of non-mine pieces left, used to determine when player has won
+        self.pieces_left = width * height - mines
+        pieces_left_str.set(f"Pieces left: {self.pieces_left}")
+        # Bool for tracking if baby mode enabled
+        self.babymode = False
+        if previous is None:
+            self.cells, self.rects, self.labels = self.ClearBoard([], [])
+        else:
+            self.cells, self.rects, self.labels = self.ClearBoard(previous.rects, previous.labels)
+        self.PlaceMines()
+        # Fit the canvas to the board's rectangles
+        canvas.configure(width=width*CELL_SIZE, height=height*CELL_SIZE)
+        # Clicks are bound once on the canvas; the clicked space is found from the event position,
+        # so spaces and labels need no bindings. Rebinding here makes this the game being played.
+        canvas.bind("<Button-1>", self.ClickSpace)
+        canvas.bind("<Button-3>", self.RightClickSpace)
+        replayBtn.configure(command=lambda: NewGame(self))
+
+    # Resets the items drawn on the old board and returns the space values of a hidden board.
+    # Each is a 2d array indexed [x][y]: cells are columns of packed space bytes (all zero, i.e. hidden,
+    # unflagged and with no count), while rects and labels hold the canvas item ids of every space.
+    def ClearBoard(self, rects, labels):
+        width = self.width
+        height = self.height
+        # Hide every label at once, then reset every rectangle at once back to a hidden space
+        canvas.itemconfigure("label", state="hidden")
+        canvas.dtag("hit", "hit")
+        canvas.itemconfigure("cell", fill=canvas["bg"], width=2)
+        # Reuse the old rectangles and labels still within the new board size (they are already in position),
+        # deleting the rest all in one call. Items are only drawn for spaces the old board did not have.
+        new_rects = [[None] * height for i in range(width)]
+        new_labels = [[None] * height for i in range(width)]
+        surplus = []
+        for x, (rect_column, label_column) in enumerate(zip(rects, labels)):
+            for y, (rect, label) in enumerate(zip(rect_column, label_column)):
+                if x < width and y < height:
+                    new_rects[x][y] = rect
+                    new_labels[x][y] = label
                 else:
-                    color = "black"
-                label = tk.Label(master=wframe, text=str(piece["count"]), fg=color)
-                if babymode:
-                    label.configure(bg='#8adaff')
-                label.bind("<Button-1>", ClickSpace)
-                label.bind("<Button-3>", RightClickSpace)
-                label.pack()
-            # If piece has no adjacent mine count, recursively reveal all 8 surrounding spaces
+                    surplus.extend((rect, label))
+        if surplus:
+            canvas.delete(*surplus)
+        drawn = False
+        for x in range(width):
+            for y in range(height):
+                if new_rects[x][y] is None:
+                    new_rects[x][y] = self.DrawSpace(x,y)
+                    new_labels[x][y] = self.DrawLabel(x,y)
+                    drawn = True
+        # Keep every label above the rectangles, including ones drawn before newer rectangles
+        if drawn:
+            canvas.tag_raise("label")
+        log.debug("Reset board canvas to %d x %d spaces.", width, height)
+        cells = [bytearray(height) for i in range(width)]
+        return cells, new_rects, new_labels
+
+    # Randomly places the game's mines on its cleared board and packs every space's adjacent mine count.
+    def PlaceMines(self):
+        width = self.width
+        height = self.height
+        cells = self.cells
+        # Randomly pick distinct spaces for every mine at once, as indices into the flattened board
+        mines = [bytearray(height) for i in range(width)]
+        for index in sample(range(width * height), self.mines):
+            x, y = divmod(index, height)
+            # Set the space to a mine
+            cells[x][y] = MINE << TYPE_SHIFT
+            mines[x][y] = 1
+            log.debug("Placing mine at space x:%d y:%d", x, y)
+        # Count the mines surrounding each space in one pass over the board, and pack the counts into the cells
+        counts = CountMines(mines, width, height)
+        self.cells = [bytearray(map(or_, column, count)) for column, count in zip(cells, counts)]
+
+    # Draws the rectangle of a hidden space (thick border) at the given coords and returns its canvas item id.
+    def DrawSpace(self,x,y):
+        return canvas.create_rectangle(
+            x*CELL_SIZE,
+            y*CELL_SIZE,
+            x*CELL_SIZE + CELL_SIZE,
+            y*CELL_SIZE + CELL_SIZE,
+            fill=canvas["bg"],
+            outline="gray",
+            width=2,
+            tags=("cell",),
+            )
+
+    # Changes the color of the board. Labels are drawn as text directly on the spaces, so they need no change.
+    # Every space is tagged "cell" and clicked mines also "hit", so one call recolors all but the red mines.
+    def ChangeColor(self,color):
+        canvas.itemconfigure("cell&&!hit", fill=color)
+
+    # Draws a hidden, empty text label centered on the space at the given coords and returns its canvas item id.
+    # Every space has one label, reused for both its mine count and its flag.
+    def DrawLabel(self,x,y):
+        return canvas.create_text(
+            x*CELL_SIZE + CELL_SIZE//2,
+            y*CELL_SIZE + CELL_SIZE//2,
+            text="",
+            font=("TkDefaultFont", 10, "bold"),
+            state="hidden",
+            tags=("label",),
+            )
+
+    # Shows the label of the space at the given coords with the given text and color.
+    def ShowLabel(self,x,y,text,color):
+        canvas.itemconfigure(self.labels[x][y], text=text, fill=color, state="normal")
+
+    # Hides the label of the space at the given coords.
+    def HideLabel(self,x,y):
+        canvas.itemconfigure(self.labels[x][y], state="hidden")
+
+    # Sets baby mode (baby mode allows continuing on the same board after a loss)
+    def SetBabyMode(self):
+        self.babymode = True
+        self.ChangeColor("#8adaff")
+
+    # Starts a new game with the same board size and number of mines.
+    def Retry(self):
+        return Game(self.width, self.height, self.mines, self)
+
+    # Opens a popup window stating loss, allows Retry, Give Up, or Baby Mode
+    def GameOver(self,x,y):
+        # Change clicked mine space to red, tagging it so ChangeColor leaves it red
+        canvas.addtag_withtag("hit", self.rects[x][y])
+        canvas.itemconfigure(self.rects[x][y], fill="red")
+        # Create new window for game over prompt
+        top= tk.Toplevel(window, padx=20, pady=20)
+        top.title("Game Over")
+        tk.Label(top, text= "You Lost!", font=('Mistral 18 bold')).pack()
+        retry = tk.Button(top, text="Retry", command = lambda: [self.Retry(),top.destroy()])
+        retry.pack(side=tk.LEFT)
+        quit = tk.Button(top, text="Give Up", command = lambda: sys.exit())
+        quit.pack(side=tk.LEFT)
+        baby = tk.Button(top, text="Baby Mode", command = lambda: [self.SetBabyMode(), top.destroy()])
+        baby.pack(side=tk.LEFT)
+        # Set board regeneration on prompt window manual deletion
+        top.protocol('WM_DELETE_WINDOW', lambda: [self.Retry(), top.destroy()])
+        # Set game window unclickable while prompt is open
+        top.transient(window)
+        top.wait_visibility()
+        top.grab_set()
+
+    # Similar to GameOver but for win prompt. Allows New Game or Quit
+    def GameWin(self):
+        top= tk.Toplevel(window, padx=10, pady=20)
+        top.title("You Win!")
+        tk.Label(top, text= "Congratulations! You won!", font=('Mistral 18 bold')).pack()
+        retry = tk.Button(top, text="New Game", command = lambda: [self.Retry(),top.destroy()])
+        retry.pack()
+        quit = tk.Button(top, text="Quit", command = lambda: sys.exit())
+        quit.pack()
+        top.transient(window)
+        top.wait_visibility()
+        top.grab_set()
+
+    # Reveals the space at the specified coordinate and, if empty, reveals nearby spaces using FloodFill().
+    # The fill only updates the space values; the canvas is updated afterwards from the spaces it revealed.
+    # Note: this should not be used when a mine or flagged space is clicked, or with coords outside the board.
+    def RevealEmpty(self,x,y):
+        revealed = FloodFill(self.cells, self.width, self.height, x, y)
+        # Apply every visual change of the fill in one batch: make revealed rectangles flat, with a thin border
+        # and their label showing the count when they have an adjacent mine count. A flag removed by the fill
+        # is replaced by the count, or hidden when there is none. Labels are configured directly rather than
+        # through ShowLabel/HideLabel, with the attributes and globals used bound to locals.
+        itemconfigure = canvas.itemconfigure
+        space_rects = self.rects
+        space_labels = self.labels
+        colors = COLOR_LUT
+        debug = log.debug
+        for x, y, count, flagged in revealed:
+            if count > 0:
+                itemconfigure(space_rects[x][y], width=1)
+                itemconfigure(space_labels[x][y], text=str(count), fill=colors[count], state="normal")
+            else:
+                itemconfigure(space_rects[x][y], width=0)
+                if flagged:
+                    itemconfigure(space_labels[x][y], state="hidden")
+            debug("Revealing pieces at x:%d y:%d", x, y)
+        # Decrement number of remaining non-mine pieces by every piece revealed, updating the displayed
+        # count once rather than once per piece (each set redraws the label in the menu)
+        self.pieces_left -= len(revealed)
+        pieces_left_str.set(f"Pieces left: {self.pieces_left}")
+        debug("Pieces left: %d", self.pieces_left)
+        canvas.update_idletasks()
+        # Win condition: if all non-mine pieces are revealed, the game is won.
+        if self.pieces_left <= 0:
+            self.GameWin()
+
+    # Returns the board coords of the space under the position of a canvas event. Spaces are laid out on a
+    # grid of CELL_SIZE pixels, so this is plain arithmetic with no lookups of widgets or canvas items.
+    # Returns None for positions on the canvas outside of the board (e.g. while it is resized).
+    def EventSpace(self,event):
+        x = event.x // CELL_SIZE
+        y = event.y // CELL_SIZE
+        if x < 0 or x >= self.width or y < 0 or y >= self.height:
+            return None
+        return x, y
+
+    # Event for left-clicking on any space in the board. Will handle accordingly.
+    def ClickSpace(self,event):
+        # Get board coords of space clicked and associated piece, ignoring clicks outside the board
+        coords = self.EventSpace(event)
+        if coords is None:
+            return
+        x, y = coords
+        cell = self.cells[x][y]
+        piece = (cell & TYPE_MASK) >> TYPE_SHIFT
+        log.debug("Piece: %s clicked at space: %d, %d", PIECE_NAMES[piece], x, y)
+        # If flag is LEFT-clicked, do nothing.
+        if cell & FLAG_BIT:
+            log.debug("Clicked Piece is a flag")
+        # If mine is clicked, game over!
+        elif piece == MINE:
+            self.GameOver(x,y)
+        # If hidden piece clicked, reveal it.
+        elif piece == HIDDEN:
+            self.RevealEmpty(x,y)
+        # Else piece must be already revealed, so do nothing.
+        else:
+            log.debug("Clicked piece is empty")
+
+    # Event for right-clicking any space on the board. Used for flagging pieces.
+    def RightClickSpace(self,event):
+        # Get board coords of space clicked and associated piece, ignoring clicks outside the board
+        coords = self.EventSpace(event)
+        if coords is None:
+            return
+        x, y = coords
+        cell = self.cells[x][y]
+        piece = (cell & TYPE_MASK) >> TYPE_SHIFT
+        log.debug("Piece: %s right clicked at space: %d, %d", PIECE_NAMES[piece], x, y)
+        # If piece is already revealed, do nothing.
+        if piece == MINE or piece == HIDDEN:
+            # Toggle flag status of piece and update its label accordingly
+            self.cells[x][y] = cell ^ FLAG_BIT
+            if cell & FLAG_BIT:
+                self.HideLabel(x,y)
             else:
-                RevealEmpty(x-1,y-1)
-                RevealEmpty(x-1,y)
-                RevealEmpty(x-1,y+1)
-                RevealEmpty(x,y-1)
-                RevealEmpty(x,y+1)
-                RevealEmpty(x+1,y-1)
-                RevealEmpty(x+1,y)
-                RevealEmpty(x+1,y+1)
-            # Decrement number of remaining non-mine pieces
-            global pieces_left
-            pieces_left -= 1
-            pieces_left_str.set(f"Pieces left: {pieces_left}")
-            if PRINT_DEBUG_INFO:
-                print(f"Revealing pieces at x:{x} y:{y}")
-                print(f"Pieces left: {pieces_left}")
-            # Win condition: if all non-mine pieces are revealed, the game is won.
-            if pieces_left <= 0:
-                GameWin()
-
-# Event for left-clicking on any frame in the board. Will handle accordingly.
-def ClickSpace(event):
-    wframe = event.widget
-    # If label is clicked, change wframe reference to its master frame
-    if isinstance(wframe, tk.Label):
-        wframe = wframe.master
-    # Get grid coords of frame clicked and associated piece
-    grid_info = wframe.grid_info()
-    x = grid_info['column']
-    y = grid_info['row']
-    piece = spaces[x][y]
-    if PRINT_DEBUG_INFO:
-        print(f"Piece: {piece['type']} clicked at space: {x}, {y}")
-    # If flag is LEFT-clicked, do nothing.
-    if piece["flag"]:
-        if PRINT_DEBUG_INFO:
-            print("Clicked Piece is a flag")
-    # If mine is clicked, game over!
-    elif piece["type"] == Piece.MINE:
-        GameOver(x,y)
-    # If hidden piece clicked, reveal it.
-    elif piece["type"] == Piece.HIDDEN:
-        RevealEmpty(x,y)
-    # Else piece must be already revealed, so do nothing.
-    elif PRINT_DEBUG_INFO:
-        print("Clicked piece is empty")
-
-# Event for right-clicking any frame on the board. Used for flagging pieces.
-def RightClickSpace(event):
-    wframe = event.widget
-    # If label is clicked, change wframe reference to its master frame
-    if isinstance(wframe, tk.Label):
-        wframe = wframe.master
-    # Get grid coords of frame clicked and associated piece
-    grid_info = wframe.grid_info()
-    x = grid_info['column']
-    y = grid_info['row']
-    piece = spaces[x][y]
-    if PRINT_DEBUG_INFO:
-        print(f"Piece: {piece['type']} right clicked at space: {x}, {y}")
-    # If piece is already revealed, do nothing.
-    if piece["type"] == Piece.MINE or piece["type"] == Piece.HIDDEN:
-        # Toggle flag status of piece and update frame accordingly
-        if piece["flag"]:
-            piece["flag"] = False
-            wframe.pack_slaves()[0].destroy()
+                self.ShowLabel(x, y, '!!', "red")
         else:
-            piece["flag"] = True
-            label = tk.Label(master=wframe, text='!!', fg="red")
-            # New flags must be given background color here if necessary
-            if babymode:
-                label.configure(bg='#8adaff')
-            label.bind("<Button-1>", ClickSpace)
-            label.bind("<Button-3>", RightClickSpace)
-            label.pack()
-    else:
-        if PRINT_DEBUG_INFO:
-            print("Clicked piece is not mine or hidden")
-
-# Increments the adjacent mine count of the piece at the given coords. Used when placing mines.
-def AddCount(x,y):
-    if x >= 0 and x < BOARD_WIDTH and y >=0 and y < BOARD_HEIGHT:
-        spaces[x][y]["count"] += 1
-
-# The function for initial and subsequent generation of a new game.
-# Resets necessary variables, initializes board with ClearBoard(), places mines, and creates frames.
-def GenerateBoard():
-    # Reset variables to initial values
-    global spaces
-    global board
-    global pieces_left
-    global babymode
-    spaces = ClearBoard()
-    pieces_left = (BOARD_HEIGHT * BOARD_WIDTH) - TOTAL_MINES
-    pieces_left_str.set(f"Pieces left: {pieces_left}")
-    babymode = False
-
-    # Randomly place mines one at a time
-    for i in range(TOTAL_MINES):
-        y = randint(0,BOARD_HEIGHT-1)
-        x = randint(0, BOARD_WIDTH-1)
-        # Pick another random spot until the space is not a mine
-        while spaces[x][y]["type"] == Piece.MINE:
-            y = randint(0,BOARD_HEIGHT-1)
-            x = randint(0, BOARD_WIDTH-1)
-        # Set the space to a mine
-        spaces[x][y]["type"] = Piece.MINE
-        if PRINT_DEBUG_INFO:
-            print(f"Placing mine at space x:{x} y:{y}")
-        # Add 1 to each surrounding space
-        AddCount(x-1,y-1)
-        AddCount(x-1,y)
-        AddCount(x-1,y+1)
-        AddCount(x,y-1)
-        AddCount(x,y+1)
-        AddCount(x+1,y-1)
-        AddCount(x+1,y)
-        AddCount(x+1,y+1)
-
-    # Add a frame for each space on the board
-    for i in range(BOARD_HEIGHT):
-        for j in range(BOARD_WIDTH):
-
-            frame = tk.Frame(
-                master=board,
-                relief=tk.RAISED,
-                borderwidth=5,
-                width=30,
-                height=30,
-                )
-            frame.pack_propagate(False)
-            frame.bind("<Button-1>", ClickSpace)
-            frame.bind("<Button-3>", RightClickSpace)
-            frame.grid(row=i, column=j)
-    board.pack()
-
-
-# Initialize spaces and generate board
-spaces = ClearBoard()
-GenerateBoard()
-# Assemble menu GUI
+            log.debug("Clicked piece is not mine or hidden")
+
+
+# Assemble board and menu GUI. The regenerate button's command is set by each game as it starts.
+board.pack()
 widthpicker.pack()
 heightpicker.pack()
 minepicker.pack()
 configframe.pack(side=tk.LEFT)
-replayBtn = tk.Button(menu, padx=10, text="Regenerate", command=NewGame)
+replayBtn = tk.Button(menu, padx=10, text="Regenerate")
 replayBtn.pack(side=tk.LEFT)
 minelabel = tk.Label(menu, padx=20, textvariable=pieces_left_str).pack(side=tk.LEFT)
 menu.pack(padx=10,pady=10)
+# Start the first game
+Game(BOARD_WIDTH, BOARD_HEIGHT, TOTAL_MINES)
 
 # Run program
 window.mainloop()